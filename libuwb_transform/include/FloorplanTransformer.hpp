@@ -28,6 +28,14 @@ struct TransformConfig {
     TransformConfig(double ox, double oy, double s, double r, bool xf, bool yf)
         : origin_x(ox), origin_y(oy), scale(s), 
           rotation_rad(r), x_flipped(xf), y_flipped(yf) {}
+
+    bool operator==(const TransformConfig& other) const {
+        return origin_x == other.origin_x && origin_y == other.origin_y &&
+               scale == other.scale && rotation_rad == other.rotation_rad &&
+               x_flipped == other.x_flipped && y_flipped == other.y_flipped;
+    }
+
+    bool operator!=(const TransformConfig& other) const { return !(*this == other); }
 };
 
 /**
@@ -1,3 +1,5 @@
+from functools import cached_property
+
 import numpy as np
 
 
@@ -11,24 +13,7 @@ class FloorplanTransformer:
             x_flipped (bool): If True, UWB X axis opposes Image X axis.
             y_flipped (bool): If True, UWB Y axis opposes Image Y axis.
         """
-        # Calculate directional Scale Factor (S)
-        s_x = scale * (-1 if x_flipped else 1)
-        s_y = scale * (-1 if y_flipped else 1)
-        
-        # Calculate Translation (T)
-        t_x = -(s_x * img_origin_uwb_x)
-        t_y = -(s_y * img_origin_uwb_y)
-        
-        # Store computed values
-        self.computed_origin_pixel_x = t_x
-        self.computed_origin_pixel_y = t_y
-
-        # Construct transformation matrix once
-        self.matrix = np.array([
-            [s_x, 0,   t_x],
-            [0,   s_y, t_y],
-            [0,   0,   1]
-        ], dtype=np.float32)
+        self.update_transform(img_origin_uwb_x, img_origin_uwb_y, scale, x_flipped, y_flipped)
 
     def update_transform(self, img_origin_uwb_x, img_origin_uwb_y, scale, x_flipped=False, y_flipped=False):
         """
@@ -46,18 +31,27 @@ class FloorplanTransformer:
         self.computed_origin_pixel_x = t_x
         self.computed_origin_pixel_y = t_y
 
-        # Update transformation matrix
-        self.matrix = np.array([
-            [s_x, 0,   t_x],
-            [0,   s_y, t_y],
-            [0,   0,   1]
+        # Affine coefficients used by the transform methods (diagonal scale + bias)
+        self._sx = s_x
+        self._sy = s_y
+        self._tx = t_x
+        self._ty = t_y
+
+        # Drop any cached matrix; it is rebuilt on next access
+        self.__dict__.pop('matrix', None)
+
+    @cached_property
+    def matrix(self):
+        """3x3 homogeneous transformation matrix (built lazily, transforms don't need it)"""
+        return np.array([
+            [self._sx, 0,        self._tx],
+            [0,        self._sy, self._ty],
+            [0,        0,        1]
         ], dtype=np.float32)
 
     def uwb_to_pixel(self, uwb_x, uwb_y):
         """Transform single UWB point (x,y) -> Pixel (x,y)"""
-        vec = np.array([uwb_x, uwb_y, 1], dtype=np.float32)
-        res = self.matrix @ vec
-        return res[0], res[1]
+        return uwb_x * self._sx + self._tx, uwb_y * self._sy + self._ty
 
     def uwb_to_pixel_batch(self, uwb_x, uwb_y):
         """
@@ -74,14 +68,14 @@ class FloorplanTransformer:
         uwb_x = np.asarray(uwb_x, dtype=np.float32)
         uwb_y = np.asarray(uwb_y, dtype=np.float32)
         
-        # Create homogeneous coordinates [N x 3]
-        points = np.stack([uwb_x, uwb_y, np.ones_like(uwb_x)], axis=-1)
-        
-        # Transform: [N x 3] @ [3 x 3].T = [N x 3]
-        transformed = points @ self.matrix.T
-        
-        # Return pixel coordinates
-        return transformed[..., 0], transformed[..., 1]
+        # The matrix is diagonal scale + translation, so apply it elementwise
+        # instead of a homogeneous [N x 3] @ [3 x 3] product.
+        # Scale into a fresh buffer and add the bias in place (one allocation per axis)
+        pixel_x = np.multiply(uwb_x, self._sx, dtype=np.float32)
+        pixel_x += self._tx
+        pixel_y = np.multiply(uwb_y, self._sy, dtype=np.float32)
+        pixel_y += self._ty
+        return pixel_x, pixel_y
 
 
 # --- Verification ---
@@ -23,6 +23,24 @@ class FloorplanTransformer:
         self.y_flipped = y_flipped
         
         self.matrix = self._calculate_matrix()
+        self.inv_matrix = np.linalg.inv(self.matrix)
+
+        # Same transforms with the pixel -> mm -> meter conversion (1 / (scale*1000))
+        # folded in, so the per-point methods need no post-scaling
+        k = 1.0 / (self.scale * 1000.0)
+        self.matrix_m = self.matrix.copy()
+        self.matrix_m[:2, :] *= k
+        self.inv_matrix_m = self.inv_matrix.copy()
+        self.inv_matrix_m[:, :2] /= k
+
+        # Compact 2x3 affines: the [0, 0, 1] bottom row is invariant, so the
+        # batch paths only compute the two output rows
+        self.M23 = self.matrix_m[:2].copy()
+        self.inv_M23 = self.inv_matrix_m[:2].copy()
+
+        # Affine rows as plain floats for the scalar per-point path
+        (self._a, self._b, self._c), (self._d, self._e, self._f) = self.matrix_m[:2].tolist()
+        (self._ia, self._ib, self._ic), (self._id, self._ie, self._if) = self.inv_matrix_m[:2].tolist()
 
     def _calculate_matrix(self):
         # --- 1. Translation Matrix (T) ---
@@ -66,18 +84,60 @@ class FloorplanTransformer:
 
     def uwb_to_pixel(self, uwb_x, uwb_y):
         """Transform UWB (x,y) -> Pixel (x,y)"""
-        vec = np.array([uwb_x, uwb_y, 1])
-        res = self.matrix @ vec
-        return (res[0]/self.scale)/1000 , (res[1]/self.scale)/1000 # Convert back to meters res[0], res[1] is in pixels
-                                                                    # Divide by scale to get it in mm, then by 1000 to get meters 
+        # Scalar form of matrix_m @ [x, y, 1] (matrix_m already converts pixels -> meters);
+        # avoids an array allocation and matmul dispatch per call
+        return (self._a * uwb_x + self._b * uwb_y + self._c,
+                self._d * uwb_x + self._e * uwb_y + self._f)
 
     def pixel_to_uwb(self, pixel_x, pixel_y):
         """Transform Pixel (x,y) -> UWB (x,y)"""
-        vec = np.array([pixel_x*1000*self.scale, pixel_y*1000*self.scale, 1]) # Convert meters to pixels for reverse transform
-        # Use the inverse of the transformation matrix
-        inv_matrix = np.linalg.inv(self.matrix)
-        res = inv_matrix @ vec
-        return res[0], res[1]  
+        # inv_matrix_m takes meters directly (meters -> pixels folded in)
+        return (self._ia * pixel_x + self._ib * pixel_y + self._ic,
+                self._id * pixel_x + self._ie * pixel_y + self._if)
+
+    def uwb_to_pixel_batch(self, uwb_x, uwb_y):
+        """
+        Transform multiple UWB points -> Pixel coordinates (vectorized)
+        
+        Args:
+            uwb_x: array-like of X coordinates (mm)
+            uwb_y: array-like of Y coordinates (mm)
+            
+        Returns:
+            tuple: (x, y) as numpy arrays shaped like the inputs, in meters like uwb_to_pixel
+        """
+        uwb_x = np.asarray(uwb_x, dtype=np.float64)
+        uwb_y = np.asarray(uwb_y, dtype=np.float64)
+        
+        # Homogeneous coordinates [3 x N], transformed with a single [2 x 3] matmul
+        pts = np.empty((3, uwb_x.size))
+        pts[0] = uwb_x.ravel()
+        pts[1] = uwb_y.ravel()
+        pts[2] = 1
+        res = self.M23 @ pts
+        return res[0].reshape(uwb_x.shape), res[1].reshape(uwb_y.shape)
+
+    def pixel_to_uwb_batch(self, pixel_x, pixel_y):
+        """
+        Transform multiple Pixel points -> UWB coordinates (vectorized)
+        
+        Args:
+            pixel_x: array-like of X coordinates (meters)
+            pixel_y: array-like of Y coordinates (meters)
+            
+        Returns:
+            tuple: (uwb_x, uwb_y) as numpy arrays shaped like the inputs (mm)
+        """
+        pixel_x = np.asarray(pixel_x, dtype=np.float64)
+        pixel_y = np.asarray(pixel_y, dtype=np.float64)
+        
+        # Apply the meter-frame inverse in one matmul
+        pts = np.empty((3, pixel_x.size))
+        pts[0] = pixel_x.ravel()
+        pts[1] = pixel_y.ravel()
+        pts[2] = 1
+        res = self.inv_M23 @ pts
+        return res[0].reshape(pixel_x.shape), res[1].reshape(pixel_y.shape)
 
 transformer = FloorplanTransformer(
     img_origin_uwb_x=23469.3880740585, 
@@ -1,8 +1,9 @@
+import io
 import math
+import sys
 import time
 
 import numpy as np
-from scipy.spatial.transform import Rotation as R_scipy
 
 
 class FloorplanTransformer:
@@ -32,6 +33,11 @@ class FloorplanTransformer:
         
         self.matrix = self._calculate_matrix()
         self.rotation_transform_matrix = self._calculate_rotation_transform()
+        self.pose_matrix = self._calculate_pose_matrix()
+        self._pose_34 = self.pose_matrix[:3].copy()  # Compact form (bottom row is always [0, 0, 0, 1])
+        self.frame_quat = self._calculate_frame_quaternion()
+        # Output orientation for an identity input: frame_quat in canonical sign
+        self._frame_quat_out = _quat_multiply(self.frame_quat, (0.0, 0.0, 0.0, 1.0))
 
     def _calculate_matrix(self):
         # --- 1. Translation Matrix (T) ---
@@ -91,6 +97,9 @@ class FloorplanTransformer:
         flip_x = -1 if self.x_flipped else 1
         flip_y = -1 if self.y_flipped else 1
         
+        # det(flip_mat @ rot_z) = flip_x * flip_y, so a single flip is a reflection
+        self._is_reflection = (flip_x * flip_y) < 0
+        
         flip_mat = np.array([
             [flip_x, 0, 0],
             [0, flip_y, 0],
@@ -100,6 +109,32 @@ class FloorplanTransformer:
         # Combined Transform for Vectors/Orientation: Flip @ Rotation
         return flip_mat @ rot_z
 
+    def _calculate_pose_matrix(self):
+        """
+        4x4 homogeneous (SE(3)-style) transform taking [x, y, z, 1] in UWB mm
+        straight to [x, y, z, 1] in output meters, so a position needs one matmul.
+        X, Y: the affine matrix with pixels -> mm -> meters (1 / (scale*1000)) folded in.
+        Z: mm -> meters only (no pixel scaling for Z).
+        """
+        k = 1.0 / (self.scale * 1000.0)
+        pose = np.eye(4)
+        pose[:2, :2] = self.matrix[:2, :2] * k
+        pose[:2, 3] = self.matrix[:2, 2] * k
+        pose[2, 2] = 1.0 / 1000.0
+        return pose
+
+    def _calculate_frame_quaternion(self):
+        """
+        Quaternion [x, y, z, w] of rotation_transform_matrix.
+        With no flip or a double flip the matrix is a pure Z rotation
+        (a double flip is an extra 180 deg yaw), so only the yaw angle is needed.
+        Single flips are reflections and have no quaternion; transform_pose
+        falls back to identity for those.
+        """
+        m = self.rotation_transform_matrix
+        yaw = math.atan2(m[1, 0], m[0, 0])
+        return (0.0, 0.0, math.sin(yaw / 2), math.cos(yaw / 2))
+
     def transform_pose(self, uwb_x, uwb_y, uwb_z=1000, qx=0, qy=0, qz=0, qw=1):
         """
         Transform 3D position and orientation.
@@ -108,54 +143,128 @@ class FloorplanTransformer:
         """
         
         # --- Position Transform ---
-        # 1. Transform X, Y using the affine matrix
-        vec = np.array([uwb_x, uwb_y, 1])
-        res = self.matrix @ vec
-        
-        # 2. Convert to meters (divide by scale to get mm, then /1000)
-        # res[0], res[1] are in Pixels. 
-        # To get meters: (Pixels / (Pixels/mm)) / 1000 = mm / 1000 = m
-        x_m = (res[0] / self.scale) / 1000.0
-        y_m = (res[1] / self.scale) / 1000.0
-        
-        # 3. Z Transform
-        # Assuming Z is just scaled by units (mm -> m). No pixel scaling for Z normally.
-        z_m = uwb_z / 1000.0
+        # One pass through pose_matrix: the X, Y affine, the pixels -> meters
+        # conversion ((Pixels / (Pixels/mm)) / 1000 = m) and Z mm -> m
+        x_m, y_m, z_m = (self._pose_34 @ np.array([uwb_x, uwb_y, uwb_z, 1.0])).tolist()
         
         # --- Orientation Transform ---
-        # 1. Convert input quaternion to Rotation Matrix
-        r_in = R_scipy.from_quat([qx, qy, qz, qw])
-        mat_in = r_in.as_matrix()
-        
-        # 2. Apply Frame Transform
-        # R_out = R_transform @ R_in
-        mat_out = self.rotation_transform_matrix @ mat_in
-        
-        # 3. Convert back to Quaternion
+        # R_out = R_transform @ R_in, and R_in is a rotation (det = 1),
+        # so det(R_out) is the (precomputed) sign of the frame transform.
         # Note: If determinant is -1 (reflection), we cannot convert to a valid rotation quaternion.
-        det = np.linalg.det(mat_out)
-        if det < 0:
+        norm = math.sqrt(qx*qx + qy*qy + qz*qz + qw*qw)
+        if not (0.0 < norm < math.inf):
+            raise ValueError(f"Found zero or non-finite norm quaternion: {[qx, qy, qz, qw]}")
+        
+        if self._is_reflection:
             # Handle Reflection: simple conversion not possible for pure rotation representation.
             # However, for 2D floorplans with doubled flips (x and y), det is positive.
             # If det is negative, we might need a workaround or warning.
             # For now, we'll try to convert and catch errors, or just warn.
-            # print(f"Warning: Transform involves reflection (det={det}), orientation may be invalid.")
+            # print("Warning: Transform involves reflection (det=-1), orientation may be invalid.")
             # Fallback: Convert the closest rotation?
-            r_out = R_scipy.from_matrix(mat_out * -1) # Flip all? No.
             # Assume strictly dealing with X+Y flip => Det=1.
             # If single flip, we ignore the flip for orientation to keep it right-handed?
             # Correct approach for single flip: Flip the output quaternion's relevant axis?
             # Let's stick to strict rotation for now.
             quat_out = [0, 0, 0, 1] 
+        elif not (qx or qy or qz) and qw > 0:
+            # Identity input (the common case): the result is just the frame rotation
+            quat_out = self._frame_quat_out
         else:
-            r_out = R_scipy.from_matrix(mat_out)
-            quat_out = r_out.as_quat() # returns [x, y, z, w]
+            # Same composition directly on quaternions: q_out = q_frame * q_in
+            quat_out = _quat_multiply(self.frame_quat, (qx/norm, qy/norm, qz/norm, qw/norm))
 
         return {
             'x': x_m, 'y': y_m, 'z': z_m,
             'qx': quat_out[0], 'qy': quat_out[1], 'qz': quat_out[2], 'qw': quat_out[3]
         }
 
+    def transform_pose_batch(self, xyz, quats):
+        """
+        Vectorized transform_pose over N poses.
+        xyz: (N, 3) array of UWB positions (mm).
+        quats: (N, 4) array of orientations [x, y, z, w].
+        Returns (positions (N, 3) in meters, quaternions (N, 4) [x, y, z, w]).
+        """
+        xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+        quats = np.asarray(quats, dtype=np.float64).reshape(-1, 4)
+        
+        n = xyz.shape[0]
+        positions = np.empty((n, 3))
+        rotations = np.empty((n, 4))
+        
+        # Process in strips of _POSE_TILE poses so each strip's position and
+        # orientation intermediates stay cache-resident, instead of making two
+        # full passes over N
+        for start in range(0, n, _POSE_TILE):
+            stop = min(start + _POSE_TILE, n)
+            xyz_t = xyz[start:stop]
+            
+            # --- Position Transform ---
+            # One [3 x 4] @ [4 x T] product gives the strip's X, Y, Z in meters
+            pts = np.empty((4, stop - start))
+            pts[:3] = xyz_t.T
+            pts[3] = 1
+            positions[start:stop] = (self._pose_34 @ pts).T
+            
+            # --- Orientation Transform ---
+            # Same rules as transform_pose (identity fallback for reflections)
+            q = quats[start:stop]
+            norms = np.linalg.norm(q, axis=1, keepdims=True)
+            valid = (norms > 0) & np.isfinite(norms)
+            if not valid.all():
+                bad = start + int(np.argmin(valid[:, 0]))
+                raise ValueError(f"Found zero or non-finite norm quaternion at index {bad}: {quats[bad].tolist()}")
+            
+            if self._is_reflection:
+                rotations[start:stop] = (0.0, 0.0, 0.0, 1.0)
+            elif not q[:, :3].any() and (q[:, 3] > 0).all():
+                # Whole strip is identity: the result is just the frame rotation
+                rotations[start:stop] = self._frame_quat_out
+            else:
+                rotations[start:stop] = _quat_multiply_batch(self.frame_quat, q / norms)
+        
+        return positions, rotations
+
+# Poses per strip in transform_pose_batch: (3 + 4) * 4096 * 8 B ~ 224 KiB,
+# about half of a typical L2
+_POSE_TILE = 4096
+
+def _quat_multiply(q1, q2):
+    """
+    Hamilton product q1 * q2 for quaternions in [x, y, z, w] order.
+    The sign is chosen so the largest component is positive (the same
+    representative scipy's Rotation.as_quat returns).
+    """
+    x1, y1, z1, w1 = q1
+    x2, y2, z2, w2 = q2
+    q = (
+        w1*x2 + x1*w2 + y1*z2 - z1*y2,
+        w1*y2 - x1*z2 + y1*w2 + z1*x2,
+        w1*z2 + x1*y2 - y1*x2 + z1*w2,
+        w1*w2 - x1*x2 - y1*y2 - z1*z2,
+    )
+    if max(q, key=abs) < 0:
+        q = tuple(0.0 - c for c in q)  # 0.0 - c rather than -c: no -0.0 components
+    return q
+
+def _quat_multiply_batch(q1, q2):
+    """
+    Hamilton product q1 * q2[i] for a single quaternion q1 and an (N, 4) array q2,
+    all in [x, y, z, w] order. Same sign convention as _quat_multiply.
+    """
+    x1, y1, z1, w1 = q1
+    x2, y2, z2, w2 = q2[:, 0], q2[:, 1], q2[:, 2], q2[:, 3]
+    q = np.empty_like(q2)
+    q[:, 0] = w1*x2 + x1*w2 + y1*z2 - z1*y2
+    q[:, 1] = w1*y2 - x1*z2 + y1*w2 + z1*x2
+    q[:, 2] = w1*z2 + x1*y2 - y1*x2 + z1*w2
+    q[:, 3] = w1*w2 - x1*x2 - y1*y2 - z1*z2
+    
+    # Largest component positive (0.0 - q rather than -q: no -0.0 components)
+    largest = q[np.arange(q.shape[0]), np.abs(q).argmax(axis=1)]
+    return np.where((largest < 0)[:, None], 0.0 - q, q)
+
 def generate_tf_output(transformer_instance, uwb_data):
     """
     Generate ROS2 /tf compatible dictionary.
@@ -167,18 +276,14 @@ def generate_tf_output(transformer_instance, uwb_data):
     sec = int(current_time)
     nanosec = int((current_time - sec) * 1e9)
     
-    for tag in uwb_data:
-        # Defaults
-        tx = tag.get('x', 0)
-        ty = tag.get('y', 0)
-        tz = tag.get('z', 1000) # Default to 1000mm (1m)
-        qx = tag.get('qx', 0)
-        qy = tag.get('qy', 0)
-        qz = tag.get('qz', 0)
-        qw = tag.get('qw', 1)
-        
-        result = transformer_instance.transform_pose(tx, ty, tz, qx, qy, qz, qw)
-        
+    # Gather all tags into arrays (same defaults as before) and transform in one pass
+    xyz = np.array([(tag.get('x', 0), tag.get('y', 0), tag.get('z', 1000)) # Default z to 1000mm (1m)
+                    for tag in uwb_data], dtype=np.float64).reshape(-1, 3)
+    quats = np.array([(tag.get('qx', 0), tag.get('qy', 0), tag.get('qz', 0), tag.get('qw', 1))
+                      for tag in uwb_data], dtype=np.float64).reshape(-1, 4)
+    positions, rotations = transformer_instance.transform_pose_batch(xyz, quats)
+    
+    for tag, (x_m, y_m, z_m), (qx, qy, qz, qw) in zip(uwb_data, positions.tolist(), rotations.tolist()):
         tf_entry = {
             "header": {
                 "stamp": {
@@ -190,15 +295,15 @@ def generate_tf_output(transformer_instance, uwb_data):
             },
             "transform": {
                 "translation": {
-                    "x": result['x'],
-                    "y": result['y'],
-                    "z": result['z']
+                    "x": x_m,
+                    "y": y_m,
+                    "z": z_m
                 },
                 "rotation": {
-                    "x": result['qx'],
-                    "y": result['qy'],
-                    "z": result['qz'],
-                    "w": result['qw']
+                    "x": qx,
+                    "y": qy,
+                    "z": qz,
+                    "w": qw
                 }
             }
         }
@@ -242,22 +347,33 @@ if __name__ == "__main__":
 
     output = generate_tf_output(transformer, mock_uwb_data)
     
-    # Print as YAML-like format
-    print("transforms:")
+    # Print as YAML-like format (rendered once, written with a single call)
+    tf_yaml_template = (
+        "- header:\n"
+        "    stamp:\n"
+        "      sec: {sec}\n"
+        "      nanosec: {nanosec}\n"
+        "    frame_id: \"{frame_id}\"\n"
+        "    child_frame_id: \"{child_frame_id}\"\n"
+        "  transform:\n"
+        "    translation:\n"
+        "      x: {tx:.4f}\n"
+        "      y: {ty:.4f}\n"
+        "      z: {tz:.4f}\n"
+        "    rotation:\n"
+        "      x: {rx:.4f}\n"
+        "      y: {ry:.4f}\n"
+        "      z: {rz:.4f}\n"
+        "      w: {rw:.4f}\n"
+    )
+    buf = io.StringIO()
+    buf.write("transforms:\n")
     for tf in output['transforms']:
-        print(f"- header:")
-        print(f"    stamp:")
-        print(f"      sec: {tf['header']['stamp']['sec']}")
-        print(f"      nanosec: {tf['header']['stamp']['nanosec']}")
-        print(f"    frame_id: \"{tf['header']['frame_id']}\"")
-        print(f"    child_frame_id: \"{tf['header']['child_frame_id']}\"")
-        print(f"  transform:")
-        print(f"    translation:")
-        print(f"      x: {tf['transform']['translation']['x']:.4f}")
-        print(f"      y: {tf['transform']['translation']['y']:.4f}")
-        print(f"      z: {tf['transform']['translation']['z']:.4f}")
-        print(f"    rotation:")
-        print(f"      x: {tf['transform']['rotation']['x']:.4f}")
-        print(f"      y: {tf['transform']['rotation']['y']:.4f}")
-        print(f"      z: {tf['transform']['rotation']['z']:.4f}")
-        print(f"      w: {tf['transform']['rotation']['w']:.4f}")
+        header, translation, rotation = tf['header'], tf['transform']['translation'], tf['transform']['rotation']
+        buf.write(tf_yaml_template.format(
+            sec=header['stamp']['sec'], nanosec=header['stamp']['nanosec'],
+            frame_id=header['frame_id'], child_frame_id=header['child_frame_id'],
+            tx=translation['x'], ty=translation['y'], tz=translation['z'],
+            rx=rotation['x'], ry=rotation['y'], rz=rotation['z'], rw=rotation['w']
+        ))
+    sys.stdout.write(buf.getvalue())
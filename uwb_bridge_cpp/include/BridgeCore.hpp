@@ -4,6 +4,7 @@
 #include "ConfigLoader.hpp"
 #include "MqttHandler.hpp"
 #include "FloorplanTransformer.hpp"
+#include <nlohmann/json.hpp>
 #include <memory>
 #include <atomic>
 #include <chrono>
@@ -19,7 +20,7 @@ struct BridgeStats {
     uint64_t failed_transforms;
     uint64_t malformed_messages;
     double avg_processing_time_us;
-    std::chrono::system_clock::time_point start_time;
+    std::chrono::steady_clock::time_point start_time;
     
     BridgeStats() 
         : total_messages(0), 
@@ -27,7 +28,7 @@ struct BridgeStats {
           failed_transforms(0),
           malformed_messages(0),
           avg_processing_time_us(0.0),
-          start_time(std::chrono::system_clock::now()) {}
+          start_time(std::chrono::steady_clock::now()) {}
 };
 
 /**
@@ -97,15 +98,15 @@ private:
     void onMessageReceived(const std::string& topic, const std::string& payload);
 
     /**
-     * @brief Parse incoming JSON message
-     * @param payload JSON string
+     * @brief Extract coordinates and tag ID from a parsed JSON message
+     * @param doc Parsed JSON payload
      * @param uwb_x Output: UWB X coordinate
      * @param uwb_y Output: UWB Y coordinate
      * @param uwb_z Output: UWB Z coordinate (optional)
      * @param tag_id Output: Tag identifier
      * @return true if parsing successful
      */
-    bool parseMessage(const std::string& payload, 
+    bool parseMessage(const nlohmann::json& doc, 
                      double& uwb_x, double& uwb_y, double& uwb_z,
                      std::string& tag_id);
 
@@ -135,13 +136,13 @@ private:
 
     /**
      * @brief Process and modify input JSON message with transformed coordinates
-     * @param payload Original JSON payload (will be modified in-place)
+     * @param j Parsed JSON payload (will be modified in-place)
      * @param transformed_x Transformed X coordinate
      * @param transformed_y Transformed Y coordinate
      * @param transformed_z Transformed Z coordinate
      * @return Modified JSON string for publishing
      */
-    std::string processAndModifyMessage(const std::string& payload,
+    std::string processAndModifyMessage(nlohmann::json& j,
                                        double transformed_x, 
                                        double transformed_y, 
                                        double transformed_z);
@@ -175,7 +176,7 @@ private:
     std::atomic<uint64_t> malformed_messages_{0};
     std::atomic<uint64_t> total_processing_time_us_{0};
     
-    std::chrono::system_clock::time_point start_time_;
+    std::chrono::steady_clock::time_point start_time_;
 };
 
 } // namespace uwb_bridge
@@ -107,9 +107,16 @@ private:
      */
     uwb_bridge::TransformConfig parseTransformConfig(const firebase::firestore::DocumentSnapshot& snapshot);
 
+    /**
+     * @brief Build the reference to the pozyx config document
+     * @return Reference to setups/&GSP&Office&29607/environment/pozyx (requires db_)
+     */
+    firebase::firestore::DocumentReference buildConfigDocRef() const;
+
     firebase::App* app_;                                        ///< Firebase App instance
     firebase::auth::Auth* auth_;                                ///< Firebase Auth instance (required for service account auth)
     firebase::firestore::Firestore* db_;                        ///< Firestore database instance
+    firebase::firestore::DocumentReference config_doc_ref_;    ///< Cached pozyx config document reference
     firebase::firestore::ListenerRegistration transform_listener_; ///< Transform config listener
     bool initialized_;                                          ///< Initialization state
     std::string project_id_;                                    ///< Firebase project ID
@@ -10,7 +10,7 @@ namespace uwb_bridge {
 
 BridgeCore::BridgeCore(const AppConfig& config)
     : config_(config), 
-      start_time_(std::chrono::system_clock::now()) {
+      start_time_(std::chrono::steady_clock::now()) {
     spdlog::info("BridgeCore initialized");
 }
 
@@ -125,7 +125,7 @@ bool BridgeCore::start() {
     }
 
     running_ = true;
-    start_time_ = std::chrono::system_clock::now();
+    start_time_ = std::chrono::steady_clock::now();
     
     spdlog::info("BridgeCore started successfully");
     spdlog::info("Listening for messages on topic: {}", config_.mqtt.source_broker.source_topic);
@@ -176,19 +176,30 @@ void BridgeCore::onMessageReceived(const std::string& topic, const std::string&
     }
     
     // Capture arrival timestamp immediately for end-to-end latency measurement
-    auto arrival_time = std::chrono::high_resolution_clock::now();
+    auto arrival_time = std::chrono::steady_clock::now();
     auto start_time = arrival_time;
     
     spdlog::debug("BridgeCore::onMessageReceived called - Topic: {}, Payload: {}", topic, payload);
     total_messages_++;
 
     try {
-        // Parse message
+        // Parse the payload once; the same document is reused for the output message
+        nlohmann::json doc;
+        try {
+            doc = nlohmann::json::parse(payload);
+        } catch (const nlohmann::json::exception& e) {
+            malformed_messages_++;
+            spdlog::error("JSON parsing error: {}", e.what());
+            spdlog::warn("Malformed message on topic {}", topic);
+            return;
+        }
+
+        // Extract coordinates
         double uwb_x, uwb_y, uwb_z = 0.0;
         std::string tag_id;
 
         spdlog::debug("Attempting to parse message...");
-        if (!parseMessage(payload, uwb_x, uwb_y, uwb_z, tag_id)) {
+        if (!parseMessage(doc, uwb_x, uwb_y, uwb_z, tag_id)) {
             malformed_messages_++;
             spdlog::warn("Malformed message on topic {}", topic);
             return;
@@ -221,12 +232,12 @@ void BridgeCore::onMessageReceived(const std::string& topic, const std::string&
         // else keep in millimeters
 
         // Process and modify the original message to preserve nested structure
-        std::string output_json = processAndModifyMessage(payload, meter_x, meter_y, transformed_z);
+        std::string output_json = processAndModifyMessage(doc, meter_x, meter_y, transformed_z);
         
         spdlog::debug("Created output JSON: {}", output_json);
 
         // Calculate processing latency (transform time)
-        auto transform_end = std::chrono::high_resolution_clock::now();
+        auto transform_end = std::chrono::steady_clock::now();
         auto transform_duration = std::chrono::duration_cast<std::chrono::microseconds>(transform_end - start_time);
         auto total_latency = std::chrono::duration_cast<std::chrono::microseconds>(transform_end - arrival_time);
         total_processing_time_us_ += transform_duration.count();
@@ -253,13 +264,13 @@ void BridgeCore::onMessageReceived(const std::string& topic, const std::string&
                 return;
             }
             
-            auto publish_start = std::chrono::high_resolution_clock::now();
+            auto publish_start = std::chrono::steady_clock::now();
             
             // Use dest_handler in dual mode, source_handler in single mode
             MqttHandler* pub_handler = is_dual_mode ? dest_ptr : source_ptr;
             
             if (pub_handler && pub_handler->publish(output_topic, output_json)) {
-                auto publish_end = std::chrono::high_resolution_clock::now();
+                auto publish_end = std::chrono::steady_clock::now();
                 auto publish_latency = std::chrono::duration_cast<std::chrono::microseconds>(publish_end - publish_start);
                 auto end_to_end = std::chrono::duration_cast<std::chrono::microseconds>(publish_end - arrival_time);
                 
@@ -277,31 +288,27 @@ void BridgeCore::onMessageReceived(const std::string& topic, const std::string&
     }
 }
 
-bool BridgeCore::parseMessage(const std::string& payload,
+bool BridgeCore::parseMessage(const nlohmann::json& doc,
                              double& uwb_x, double& uwb_y, double& uwb_z,
                              std::string& tag_id) {
     try {
-        auto j = nlohmann::json::parse(payload);
-        
         // Handle Pozyx array format: [{"coordinates": {...}, ...}]
-        if (j.is_array() && !j.empty()) {
-            j = j[0];  // Extract first element
-        }
+        const auto& j = (doc.is_array() && !doc.empty()) ? doc[0] : doc;
 
         // Try different possible field names for coordinates
         // Pozyx nested format: {"data": {"coordinates": {"x": ..., "y": ..., "z": ...}}}
         if (j.contains("data") && j["data"].is_object() && 
             j["data"].contains("coordinates") && j["data"]["coordinates"].is_object()) {
-            auto coords = j["data"]["coordinates"];
-            uwb_x = coords["x"].get<double>();
-            uwb_y = coords["y"].get<double>();
+            const auto& coords = j["data"]["coordinates"];
+            uwb_x = coords.at("x").get<double>();
+            uwb_y = coords.at("y").get<double>();
             uwb_z = coords.value("z", 0.0);
         }
         // Pozyx format: {"coordinates": {"x": ..., "y": ..., "z": ...}}
         else if (j.contains("coordinates") && j["coordinates"].is_object()) {
-            auto coords = j["coordinates"];
-            uwb_x = coords["x"].get<double>();
-            uwb_y = coords["y"].get<double>();
+            const auto& coords = j["coordinates"];
+            uwb_x = coords.at("x").get<double>();
+            uwb_y = coords.at("y").get<double>();
             uwb_z = coords.value("z", 0.0);
         }
         // Simple format: {"x": ..., "y": ..., "z": ...}
@@ -316,9 +323,9 @@ bool BridgeCore::parseMessage(const std::string& payload,
             uwb_y = j["posY"].get<double>();
             uwb_z = j.value("posZ", 0.0);
         } else if (j.contains("position")) {
-            auto pos = j["position"];
-            uwb_x = pos["x"].get<double>();
-            uwb_y = pos["y"].get<double>();
+            const auto& pos = j["position"];
+            uwb_x = pos.at("x").get<double>();
+            uwb_y = pos.at("y").get<double>();
             uwb_z = pos.value("z", 0.0);
         } else {
             spdlog::warn("Message missing coordinate fields");
@@ -377,13 +384,11 @@ std::string BridgeCore::createOutputMessage(const std::string& tag_id,
     return j.dump();
 }
 
-std::string BridgeCore::processAndModifyMessage(const std::string& payload,
+std::string BridgeCore::processAndModifyMessage(nlohmann::json& j,
                                                double transformed_x, 
                                                double transformed_y, 
                                                double transformed_z) {
     try {
-        auto j = nlohmann::json::parse(payload);
-        
         // Handle array format - modify first element
         bool is_array = j.is_array();
         auto& target = is_array ? j[0] : j;
@@ -460,7 +465,7 @@ BridgeStats BridgeCore::getStats() const {
 
 void BridgeCore::printStats() const {
     auto stats = getStats();
-    auto now = std::chrono::system_clock::now();
+    auto now = std::chrono::steady_clock::now();
     auto uptime = std::chrono::duration_cast<std::chrono::seconds>(now - stats.start_time);
     
     spdlog::info("=================================================");
@@ -89,6 +89,9 @@ bool FirestoreManager::initialize() {
             return false;
         }
         
+        // Build the pozyx document reference once; reused by fetch and listener
+        config_doc_ref_ = buildConfigDocRef();
+        
         spdlog::info("Firestore initialized successfully");
         initialized_ = true;
         return true;
@@ -201,6 +204,9 @@ bool FirestoreManager::initializeWithServiceAccount(const std::string& credentia
             return false;
         }
         
+        // Build the pozyx document reference once; reused by fetch and listener
+        config_doc_ref_ = buildConfigDocRef();
+        
         spdlog::info("Firestore initialized successfully");
         initialized_ = true;
         return true;
@@ -211,6 +217,14 @@ bool FirestoreManager::initializeWithServiceAccount(const std::string& credentia
     }
 }
 
+firebase::firestore::DocumentReference FirestoreManager::buildConfigDocRef() const {
+    // Path: setups/&GSP&Office&29607/environment/pozyx
+    return db_->Collection("setups")
+              .Document("&GSP&Office&29607")
+              .Collection("environment")
+              .Document("pozyx");
+}
+
 std::future<AppConfig> FirestoreManager::fetchAppConfig() {
     if (!initialized_) {
         throw std::runtime_error("FirestoreManager not initialized. Call initialize() first.");
@@ -221,15 +235,8 @@ std::future<AppConfig> FirestoreManager::fetchAppConfig() {
     
     spdlog::info("Fetching AppConfig from Firestore...");
     
-    // Get reference to the pozyx document (same path as transform listener)
-    // Path: setups/&GSP&Office&29607/environment/pozyx
-    auto doc_ref = db_->Collection("setups")
-                       .Document("&GSP&Office&29607")
-                       .Collection("environment")
-                       .Document("pozyx");
-    
-    // Perform async Get operation
-    doc_ref.Get().OnCompletion(
+    // Perform async Get operation on the cached pozyx document reference
+    config_doc_ref_.Get().OnCompletion(
         [this, promise](const firebase::Future<firebase::firestore::DocumentSnapshot>& result) {
             if (result.error() != firebase::firestore::Error::kErrorOk) {
                 spdlog::error("Failed to fetch AppConfig: {} (code: {})", 
@@ -280,15 +287,8 @@ bool FirestoreManager::startTransformListener(std::shared_ptr<uwb_transform::Flo
     
     spdlog::info("Starting real-time listener for TransformConfig...");
     
-    // Get reference to the pozyx document in your Firestore structure
-    // Path: setups/&GSP&Office&29607/environment/pozyx
-    auto doc_ref = db_->Collection("setups")
-                       .Document("&GSP&Office&29607")
-                       .Collection("environment")
-                       .Document("pozyx");
-    
-    // Add OnSnapshot listener for real-time updates
-    transform_listener_ = doc_ref.AddSnapshotListener(
+    // Add OnSnapshot listener for real-time updates (same document as fetchAppConfig)
+    transform_listener_ = config_doc_ref_.AddSnapshotListener(
         [this, transformer](const firebase::firestore::DocumentSnapshot& snapshot,
                            firebase::firestore::Error error,
                            const std::string& error_message) {
@@ -316,6 +316,13 @@ bool FirestoreManager::startTransformListener(std::shared_ptr<uwb_transform::Flo
                 transform_config.x_flipped = new_config.x_flipped;
                 transform_config.y_flipped = new_config.y_flipped;
                 
+                // The pozyx document also holds broker settings; skip the matrix
+                // rebuild (and exclusive lock) when the transform itself is unchanged
+                if (transform_config == transformer->getConfig()) {
+                    spdlog::debug("TransformConfig unchanged, skipping matrix update");
+                    return;
+                }
+                
                 // Thread-safe update to the transformer
                 transformer->updateConfig(transform_config);
                 
@@ -5,19 +5,23 @@ Publishes dummy UWB messages to test performance and latency under load
 """
 
 import argparse
+import concurrent.futures
 import json
-import random
-import statistics
 import threading
 import time
 from datetime import datetime
 
+import numpy as np
 import paho.mqtt.client as mqtt
 
 
 class LoadTester:
+    # Pozyx format: array with nested data.coordinates structure
+    POZYX_TEMPLATE = b'[{"tagId":"%s","data":{"coordinates":{"x":%d,"y":%d,"z":%d}}}]'
+    
     def __init__(self, broker_host, broker_port, num_messages, burst_mode=True, qos=1, 
-                 source_topic="tags", dest_topic="processed/tags", verbose=False):
+                 source_topic="tags", dest_topic="processed/tags", verbose=False, num_publishers=4,
+                 num_subscribers=1):
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.num_messages = num_messages
@@ -26,46 +30,69 @@ class LoadTester:
         self.source_topic = source_topic  # Where to publish (e.g., "tags" or "test/tags")
         self.dest_topic = dest_topic      # Where to subscribe (e.g., "processed/tags" or "test/processed")
         self.verbose = verbose
+        self.num_publishers = max(1, num_publishers)  # Messages are sharded i % num_publishers
+        self.num_subscribers = max(1, num_subscribers)  # >1 uses an MQTTv5 shared subscription
         
         # Statistics
         self.messages_sent = 0
-        self.messages_received = 0
-        self.latencies = []
-        self.send_times = {}
+        # Receive-side state is kept per subscriber (each is written only by that
+        # subscriber's network thread) and merged when read
+        self.received_counts = [0] * self.num_subscribers
+        # Latencies and send times are perf_counter_ns() stamps (int64 ns);
+        # converted to ms only in print_statistics
+        self.latencies = [np.empty(num_messages, dtype=np.int64) for _ in range(self.num_subscribers)]
+        self.n_latencies = [0] * self.num_subscribers
+        # Tag ids are str(i) for i in range(num_messages), so send times are
+        # indexed by int(tag_id) instead of a string-keyed dict
+        self.send_times = np.zeros(num_messages, dtype=np.int64)
+        self.received_mask = np.zeros(num_messages, dtype=bool)
         self.lock = threading.Lock()
         
         # Connection ready flags
         self.publisher_ready = False
         self.subscriber_ready = False
+        self.publishers_connected = 0
+        self.subscribers_connected = 0
         
         # MQTT clients
-        self.publisher = None
-        self.subscriber = None
+        self.publishers = []
+        self.subscribers = []
         
         # Sample tag IDs for testing
         # self.tag_ids = ["99", "111", "200000768", "test_tag_1", "test_tag_2"]
         
     def on_connect_pub(self, client, userdata, flags, rc):
         if rc == 0:
-            print(f"✓ Publisher connected to {self.broker_host}:{self.broker_port}")
-            self.publisher_ready = True
+            print(f"✓ Publisher {userdata} connected to {self.broker_host}:{self.broker_port}")
+            with self.lock:
+                self.publishers_connected += 1
+                self.publisher_ready = self.publishers_connected == self.num_publishers
         else:
             print(f"✗ Publisher connection failed with code {rc}")
             
-    def on_connect_sub(self, client, userdata, flags, rc):
+    @property
+    def messages_received(self):
+        return sum(self.received_counts)
+    
+    def on_connect_sub(self, client, userdata, flags, rc, properties=None):
         if rc == 0:
-            print(f"✓ Subscriber connected to {self.broker_host}:{self.broker_port}")
-            # Subscribe to processed messages
+            print(f"✓ Subscriber {userdata} connected to {self.broker_host}:{self.broker_port}")
+            # Subscribe to processed messages; with several subscribers the broker
+            # load-balances them through a shared subscription group
             subscribe_topic = f"{self.dest_topic}/#"
+            if self.num_subscribers > 1:
+                subscribe_topic = f"$share/loadtest/{subscribe_topic}"
             client.subscribe(subscribe_topic, qos=self.qos)
             print(f"✓ Subscribed to {subscribe_topic}")
-            self.subscriber_ready = True
+            with self.lock:
+                self.subscribers_connected += 1
+                self.subscriber_ready = self.subscribers_connected == self.num_subscribers
         else:
             print(f"✗ Subscriber connection failed with code {rc}")
     
     def on_message(self, client, userdata, msg):
         """Handle received processed messages"""
-        receive_time = time.time()
+        receive_time = time.perf_counter_ns()
         
         if self.verbose:
             print(f"[RECV] Topic: {msg.topic}, Payload: {msg.payload.decode()[:100]}...")
@@ -77,41 +104,26 @@ class LoadTester:
             if self.verbose:
                 print(f"[RECV] Parsed tag_id: {tag_id}")
             
-            # Calculate latency if we have the send time
-            msg_key = f"{tag_id}"
-            with self.lock:
-                if msg_key in self.send_times:
-                    latency_ms = (receive_time - self.send_times[msg_key]) * 1000
-                    self.latencies.append(latency_ms)
-                    del self.send_times[msg_key]
-                    if self.verbose:
-                        print(f"[LATENCY] {tag_id}: {latency_ms:.2f}ms")
-                
-                self.messages_received += 1
+            # Calculate latency if we have the send time. Each subscriber's callbacks
+            # run on its own network thread and only touch its own slot (userdata),
+            # so no lock is needed here.
+            idx = int(tag_id) if isinstance(tag_id, str) and tag_id.isdigit() else -1
+            if 0 <= idx < self.num_messages and self.send_times[idx] and not self.received_mask[idx]:
+                latency_ns = receive_time - int(self.send_times[idx])
+                self.latencies[userdata][self.n_latencies[userdata]] = latency_ns
+                self.n_latencies[userdata] += 1
+                self.received_mask[idx] = True
+                if self.verbose:
+                    print(f"[LATENCY] {tag_id}: {latency_ns * 1e-6:.2f}ms")
+            
+            self.received_counts[userdata] += 1
                 
         except Exception as e:
             print(f"Error processing received message: {e}")
     
-    def generate_pozyx_message(self, tag_id):
-        """Generate a dummy Pozyx-format UWB message"""
-        # Random coordinates within realistic range (0-50000 mm)
-        x = random.randint(500, 50000)
-        y = random.randint(500, 50000)
-        z = random.randint(0, 3000)
-        
-        # Pozyx format: array with nested data.coordinates structure
-        message = [{
-            "tagId": tag_id,
-            "data": {
-                "coordinates": {
-                    "x": x,
-                    "y": y,
-                    "z": z
-                }
-            }
-        }]
-        
-        return json.dumps(message)
+    def generate_pozyx_message(self, tag_id, x, y, z):
+        """Generate a dummy Pozyx-format UWB message (bytes)"""
+        return self.POZYX_TEMPLATE % (tag_id.encode(), x, y, z)
     
     def publish_messages(self):
         """Publish test messages"""
@@ -130,40 +142,65 @@ class LoadTester:
         print(f"Publishing {self.num_messages} messages...")
         print(f"Mode: {'BURST' if self.burst_mode else 'STEADY'} (QoS={self.qos})")
         print(f"Topic: {self.source_topic}/<tag_id>")
+        print(f"Publishers: {self.num_publishers}")
         print(f"{'='*60}\n")
         
+        # Serialize everything up front so the timed loop only publishes
+        tag_ids = [str(i) for i in range(self.num_messages)]
+        topics = [f"{self.source_topic}/{tag_id}" for tag_id in tag_ids]
+        # Random coordinates within realistic range (0-50000 mm)
+        xs = np.random.randint(500, 50001, size=self.num_messages).tolist()
+        ys = np.random.randint(500, 50001, size=self.num_messages).tolist()
+        zs = np.random.randint(0, 3001, size=self.num_messages).tolist()
+        payloads = [self.generate_pozyx_message(tag_id, x, y, z)
+                    for tag_id, x, y, z in zip(tag_ids, xs, ys, zs)]
+        send_times = self.send_times
+        # In steady mode each shard paces itself so the total stays ~100 msg/sec
+        delay = 0.01 * self.num_publishers
+        
+        def publish_shard(k):
+            """Publish messages k, k+K, k+2K, ... on publisher k; returns the count sent"""
+            K = self.num_publishers
+            # Bind everything the hot loop touches to locals; topics and payloads
+            # are walked in lockstep so each iteration is two reads + publish
+            publish = self.publishers[k].publish
+            qos = self.qos
+            verbose = self.verbose
+            steady = not self.burst_mode
+            last_paced = self.num_messages - K
+            now_ns = time.perf_counter_ns
+            ok = mqtt.MQTT_ERR_SUCCESS
+            sent = 0
+            for i, topic, payload in zip(range(k, self.num_messages, K), topics[k::K], payloads[k::K]):
+                if verbose and i < 3:
+                    print(f"[SEND] Topic: {topic}, Payload: {payload.decode()}")
+                
+                # Record send time for latency calculation (single int store, no lock)
+                send_times[i] = now_ns()
+                
+                # Publish
+                result = publish(topic, payload, qos=qos)
+                
+                if result.rc != ok:
+                    print(f"✗ Failed to publish message {i+1}")
+                else:
+                    sent += 1
+                
+                # In steady mode, add small delay between messages
+                if steady and i < last_paced:
+                    time.sleep(delay)  # 10ms * K per shard = 100 msg/sec overall
+                
+                # Progress indicator
+                if (i + 1) % 100 == 0:
+                    print(f"  Sent {i+1}/{self.num_messages} messages...")
+            return sent
+        
         start_time = time.time()
         
-        for i in range(self.num_messages):
-            tag_id = str(i)
-            topic = f"{self.source_topic}/{tag_id}"
-            payload = self.generate_pozyx_message(tag_id)
-            
-            if self.verbose and i < 3:
-                print(f"[SEND] Topic: {topic}, Payload: {payload}")
-            
-            # Record send time for latency calculation
-            msg_key = f"{tag_id}"
-            send_time = time.time()
-            with self.lock:
-                self.send_times[msg_key] = send_time
-            
-            # Publish
-            result = self.publisher.publish(topic, payload, qos=self.qos)
-            
-            if result.rc != mqtt.MQTT_ERR_SUCCESS:
-                print(f"✗ Failed to publish message {i+1}")
-            else:
-                with self.lock:
-                    self.messages_sent += 1
-            
-            # In steady mode, add small delay between messages
-            if not self.burst_mode and i < self.num_messages - 1:
-                time.sleep(0.01)  # 10ms delay = 100 msg/sec
-            
-            # Progress indicator
-            if (i + 1) % 100 == 0:
-                print(f"  Sent {i+1}/{self.num_messages} messages...")
+        # Each shard gets its own client and thread; paho releases the GIL on socket writes
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_publishers) as pool:
+            shard_counts = list(pool.map(publish_shard, range(self.num_publishers)))
+        self.messages_sent = sum(shard_counts)
         
         publish_duration = time.time() - start_time
         print(f"\n✓ Published {self.messages_sent} messages in {publish_duration:.2f}s")
@@ -177,8 +214,7 @@ class LoadTester:
         last_count = 0
         
         while (time.time() - start_wait) < timeout:
-            with self.lock:
-                current_count = self.messages_received
+            current_count = self.messages_received
             
             # Print progress
             if current_count != last_count:
@@ -207,19 +243,18 @@ class LoadTester:
             print(f"  Lost:     {self.messages_sent - self.messages_received}")
             print(f"  Success:  {(self.messages_received/self.messages_sent*100):.1f}%")
             
-            if self.latencies:
-                print(f"\nEnd-to-End Latency (ms):")
-                print(f"  Min:      {min(self.latencies):.2f}")
-                print(f"  Max:      {max(self.latencies):.2f}")
-                print(f"  Mean:     {statistics.mean(self.latencies):.2f}")
-                print(f"  Median:   {statistics.median(self.latencies):.2f}")
-                print(f"  StdDev:   {statistics.stdev(self.latencies):.2f}" if len(self.latencies) > 1 else "  StdDev:   N/A")
+            lat = np.concatenate([buf[:n] for buf, n in zip(self.latencies, self.n_latencies)])
+            lat = lat.astype(np.float64) * 1e-6  # ns -> ms
+            if lat.size:
+                # Percentiles (selection-based, no full sort)
+                p50, p95, p99 = np.percentile(lat, [50, 95, 99])
                 
-                # Percentiles
-                sorted_latencies = sorted(self.latencies)
-                p50 = sorted_latencies[len(sorted_latencies) * 50 // 100]
-                p95 = sorted_latencies[len(sorted_latencies) * 95 // 100]
-                p99 = sorted_latencies[len(sorted_latencies) * 99 // 100]
+                print(f"\nEnd-to-End Latency (ms):")
+                print(f"  Min:      {lat.min():.2f}")
+                print(f"  Max:      {lat.max():.2f}")
+                print(f"  Mean:     {lat.mean():.2f}")
+                print(f"  Median:   {p50:.2f}")
+                print(f"  StdDev:   {lat.std(ddof=1):.2f}" if lat.size > 1 else "  StdDev:   N/A")
                 
                 print(f"\nPercentiles:")
                 print(f"  P50:      {p50:.2f}")
@@ -233,18 +268,23 @@ class LoadTester:
     def run(self):
         """Run the load test"""
         try:
-            # Setup publisher
-            self.publisher = mqtt.Client(client_id="load_test_publisher")
-            self.publisher.on_connect = self.on_connect_pub
-            self.publisher.connect(self.broker_host, self.broker_port, keepalive=60)
-            self.publisher.loop_start()
+            # Setup publishers (one client per shard)
+            for k in range(self.num_publishers):
+                publisher = mqtt.Client(client_id=f"load_test_publisher_{k}", userdata=k)
+                publisher.on_connect = self.on_connect_pub
+                publisher.connect(self.broker_host, self.broker_port, keepalive=60)
+                publisher.loop_start()
+                self.publishers.append(publisher)
             
-            # Setup subscriber
-            self.subscriber = mqtt.Client(client_id="load_test_subscriber")
-            self.subscriber.on_connect = self.on_connect_sub
-            self.subscriber.on_message = self.on_message
-            self.subscriber.connect(self.broker_host, self.broker_port, keepalive=60)
-            self.subscriber.loop_start()
+            # Setup subscribers (shared subscriptions need MQTTv5)
+            protocol = mqtt.MQTTv5 if self.num_subscribers > 1 else mqtt.MQTTv311
+            for k in range(self.num_subscribers):
+                subscriber = mqtt.Client(client_id=f"load_test_subscriber_{k}", userdata=k, protocol=protocol)
+                subscriber.on_connect = self.on_connect_sub
+                subscriber.on_message = self.on_message
+                subscriber.connect(self.broker_host, self.broker_port, keepalive=60)
+                subscriber.loop_start()
+                self.subscribers.append(subscriber)
             
             # Wait for both connections to be ready
             print("\nWaiting for MQTT connections...")
@@ -255,8 +295,8 @@ class LoadTester:
             
             if not self.publisher_ready or not self.subscriber_ready:
                 print("✗ MQTT connections not ready!")
-                print(f"  Publisher: {'✓' if self.publisher_ready else '✗'}")
-                print(f"  Subscriber: {'✓' if self.subscriber_ready else '✗'}")
+                print(f"  Publishers: {self.publishers_connected}/{self.num_publishers}")
+                print(f"  Subscribers: {self.subscribers_connected}/{self.num_subscribers}")
                 return
             
             print("✓ Both MQTT clients ready\n")
@@ -277,12 +317,12 @@ class LoadTester:
         
         finally:
             # Cleanup
-            if self.publisher:
-                self.publisher.loop_stop()
-                self.publisher.disconnect()
-            if self.subscriber:
-                self.subscriber.loop_stop()
-                self.subscriber.disconnect()
+            for publisher in self.publishers:
+                publisher.loop_stop()
+                publisher.disconnect()
+            for subscriber in self.subscribers:
+                subscriber.loop_stop()
+                subscriber.disconnect()
 
 
 def main():
@@ -319,6 +359,10 @@ Examples:
                         help='Source topic prefix to publish to (default: tags, for test config use: test/tags)')
     parser.add_argument('--dest-topic', default='processed/tags',
                         help='Destination topic prefix to subscribe (default: processed/tags, for test config use: test/processed)')
+    parser.add_argument('-P', '--publishers', type=int, default=4,
+                        help='Number of concurrent publisher clients (default: 4)')
+    parser.add_argument('-S', '--subscribers', type=int, default=1,
+                        help='Number of subscriber clients; >1 uses an MQTTv5 shared subscription (default: 1)')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Enable verbose debug output')
     
@@ -331,6 +375,8 @@ Examples:
     print(f"Messages:     {args.num_messages}")
     print(f"Mode:         {args.mode.upper()}")
     print(f"QoS:          {args.qos}")
+    print(f"Publishers:   {args.publishers}")
+    print(f"Subscribers:  {args.subscribers}")
     print(f"Source Topic: {args.source_topic}/#")
     print(f"Dest Topic:   {args.dest_topic}/#")
     print(f"Verbose:      {args.verbose}")
@@ -343,7 +389,9 @@ Examples:
         qos=args.qos,
         source_topic=args.source_topic,
         dest_topic=args.dest_topic,
-        verbose=args.verbose
+        verbose=args.verbose,
+        num_publishers=args.publishers,
+        num_subscribers=args.subscribers
     )
     
     tester.run()